@@ -1,12 +1,20 @@
-from fastapi import FastAPI, HTTPException, Depends
+import json
+import os
+import secrets
+import time
+from collections import OrderedDict
+from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Request, Header, Query
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional, Dict
+from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, Any
 from .chatbot import ChatBot
 from .auth import OpenBOMAuth, OpenBOMCredentials
+from .bulk_import import BulkImportJob, BulkImportError, detect_format
+from .config.config import BULK_IMPORT_CONFIG, PROFILING_CONFIG, RESULTS_CONFIG
+from .profiling import RequestProfile, profile_store, track_request
 
 app = FastAPI(
     title="PLM Chatbot API",
@@ -23,6 +31,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def _is_admin_token(token: Optional[str]) -> bool:
+    """Check a token against the configured admin token in constant time"""
+    admin_token = PROFILING_CONFIG['admin_token']
+    return bool(admin_token and token) and secrets.compare_digest(token.encode(), admin_token.encode())
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    """Capture spans and stack samples for opted-in, sampled-all or slow requests"""
+    if request.url.path.startswith(("/admin/", "/static/")):
+        return await call_next(request)
+
+    # X-Profile opts a single request in; while profiling is globally off it
+    # also needs the admin token so clients can't start samplers at will
+    requested = request.headers.get("x-profile", "").lower() in ("1", "true") and (
+        PROFILING_CONFIG['enabled'] or _is_admin_token(request.headers.get("x-admin-token"))
+    )
+    if not (PROFILING_CONFIG['enabled'] or requested):
+        # Still counted so profiles can report overlapping requests
+        with track_request():
+            return await call_next(request)
+
+    with RequestProfile(request.method, request.url.path, sample=True) as profile:
+        with track_request(profile):
+            response = await call_next(request)
+
+    if requested or PROFILING_CONFIG['profile_all']:
+        reason = "requested" if requested else "profile_all"
+    elif profile.duration_ms >= PROFILING_CONFIG['slow_request_threshold_ms']:
+        reason = "slow"
+    else:
+        return response
+    profile_store.add(profile, reason)
+    response.headers["X-Profile-Id"] = profile.id
+    return response
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -35,13 +78,23 @@ auth_handler = OpenBOMAuth()
 # Initialize chatbot
 chatbot = ChatBot(auth_handler)
 
+# Bulk import jobs started by this process, keyed by job id
+import_jobs: Dict[str, BulkImportJob] = {}
+
 class Message(BaseModel):
     content: str
 
 class ChatResponse(BaseModel):
     response: str
+    result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
+class ProfilingSettings(BaseModel):
+    enabled: Optional[bool] = None
+    profile_all: Optional[bool] = None
+    slow_request_threshold_ms: Optional[float] = Field(None, gt=0)
+    sample_interval_ms: Optional[float] = Field(None, gt=0)
+
 @app.get("/")
 async def root():
     """
@@ -72,11 +125,46 @@ async def chat(message: Message):
         if not auth_handler.access_token:
             raise HTTPException(status_code=401, detail="Not authenticated")
         
-        response = await chatbot.handle_message(message.content)
-        return ChatResponse(response=response)
+        response, result = await chatbot.handle_message_with_result(message.content)
+        return ChatResponse(response=response, result=result)
     except Exception as e:
         return ChatResponse(response="", error=str(e))
 
+@app.post("/chat/stream")
+async def chat_stream(message: Message):
+    """
+    Send a message to the chatbot and stream the answer as NDJSON: a
+    "message" line with the text and result metadata, "rows" lines with
+    chunks of result rows, then an "end" line
+    """
+    if not auth_handler.access_token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    try:
+        response, result = await chatbot.handle_message_with_result(message.content)
+    except Exception as e:
+        response, result = "", None
+        error = str(e)
+    else:
+        error = None
+
+    def lines():
+        if error:
+            yield json.dumps({"type": "error", "error": error}) + "\n"
+            return
+        head = {"type": "message", "response": response}
+        if result:
+            head["result"] = {key: value for key, value in result.items() if key != "rows"}
+        yield json.dumps(head) + "\n"
+        if result:
+            rows = result["rows"]
+            size = RESULTS_CONFIG['stream_chunk_rows']
+            for offset in range(0, len(rows), size):
+                yield json.dumps({"type": "rows", "offset": offset, "rows": rows[offset:offset + size]}) + "\n"
+        yield json.dumps({"type": "end"}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
 @app.post("/chat/clear")
 async def clear_chat():
     """Clear chat history"""
@@ -86,27 +174,121 @@ async def clear_chat():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/chat/models/stats")
+async def get_model_stats():
+    """Get model cascade routing, latency and cost statistics"""
+    if not auth_handler.access_token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    return chatbot.model_cascade.stats()
+
+# Upstream item lists by key, as (fetched_at, items), least recently used first
+_list_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+def _cached_list(key: str, fetch) -> Optional[list]:
+    """Fetch a full item list once and reuse it for subsequent page requests"""
+    cached = _list_cache.get(key)
+    if cached and time.time() - cached[0] < RESULTS_CONFIG['list_cache_ttl']:
+        _list_cache.move_to_end(key)
+        return cached[1]
+
+    items = fetch()
+    # Don't cache failures so the next page request retries
+    if items is None or (items and isinstance(items[0], dict) and "error" in items[0]):
+        return items
+    _list_cache[key] = (time.time(), items)
+    _list_cache.move_to_end(key)
+    while len(_list_cache) > RESULTS_CONFIG['list_cache_size']:
+        _list_cache.popitem(last=False)
+    return items
+
+def _page(items: Optional[list], offset: int, limit: Optional[int]) -> Dict[str, Any]:
+    """Slice a list for paged responses"""
+    items = items or []
+    limit = min(limit or RESULTS_CONFIG['page_size'], RESULTS_CONFIG['max_page_size'])
+    return {"items": items[offset:offset + limit], "offset": offset, "total": len(items)}
+
 @app.get("/boms")
-async def get_boms():
-    """Get list of BOMs"""
+async def get_boms(offset: int = Query(0, ge=0), limit: Optional[int] = Query(None, ge=1)):
+    """Get list of BOMs, optionally one page at a time"""
     try:
         if not auth_handler.access_token:
             raise HTTPException(status_code=401, detail="Not authenticated")
         
         boms = chatbot.plm_client.get_boms()
-        return {"boms": boms}
+        if limit is None and not offset:
+            return {"boms": boms}
+        page = _page(boms, offset, limit)
+        return {"boms": page["items"], "offset": page["offset"], "total": page["total"]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/boms/{bom_id}")
+async def get_bom_details(bom_id: str):
+    """Get details for a specific BOM"""
+    try:
+        if not auth_handler.access_token:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        
+        details = chatbot.plm_client.get_bom_details(bom_id)
+        if not details:
+            raise HTTPException(status_code=404, detail=f"BOM {bom_id} not found")
+        return details
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/boms/{bom_id}/items")
+async def get_bom_items(bom_id: str, offset: int = Query(0, ge=0), limit: Optional[int] = Query(None, ge=1)):
+    """Get one page of a BOM's line items"""
+    try:
+        if not auth_handler.access_token:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        
+        items = _cached_list(f"bom:{bom_id}", lambda: chatbot.plm_client.get_bom_items(bom_id))
+        if items is None:
+            raise HTTPException(status_code=404, detail=f"BOM {bom_id} not found")
+        return _page(items, offset, limit)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/catalogs")
-async def get_catalogs():
-    """Get list of catalogs"""
+async def get_catalogs(offset: int = Query(0, ge=0), limit: Optional[int] = Query(None, ge=1)):
+    """Get list of catalogs, optionally one page at a time"""
     try:
         if not auth_handler.access_token:
             raise HTTPException(status_code=401, detail="Not authenticated")
         
         catalogs = chatbot.plm_client.get_catalogs()
-        return {"catalogs": catalogs}
+        if limit is None and not offset:
+            return {"catalogs": catalogs}
+        page = _page(catalogs, offset, limit)
+        return {"catalogs": page["items"], "offset": page["offset"], "total": page["total"]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/catalogs/{catalog_id}/items")
+async def get_catalog_items(catalog_id: str, offset: int = Query(0, ge=0), limit: Optional[int] = Query(None, ge=1)):
+    """Get one page of items from a catalog"""
+    try:
+        if not auth_handler.access_token:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        
+        items = _cached_list(
+            f"catalog:{catalog_id}", lambda: chatbot.plm_client.get_catalog_items(catalog_id)
+        )
+        if items and isinstance(items[0], dict) and "error" in items[0]:
+            raise HTTPException(status_code=502, detail=items[0]["error"])
+        return _page(items, offset, limit)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -134,4 +316,126 @@ async def search_parts(query: str):
         results = chatbot.plm_client.search_parts(query)
         return {"results": results}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _start_import_job(job: BulkImportJob):
+    """Run an import job on a background thread"""
+    try:
+        job.start()
+    except BulkImportError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    import_jobs[job.job_id] = job
+
+def _get_import_job(job_id: str) -> BulkImportJob:
+    """Look up a job in memory, falling back to its checkpoint on disk"""
+    if job_id not in import_jobs:
+        try:
+            job = BulkImportJob.load(chatbot.plm_client, job_id)
+        except BulkImportError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        # A checkpoint still marked running means the process died mid-import
+        if job.state == 'running':
+            job.state = 'interrupted'
+        # Keep one instance per job so concurrent requests share its state
+        import_jobs.setdefault(job_id, job)
+    return import_jobs[job_id]
+
+@app.post("/imports")
+async def start_import(file: UploadFile = File(...)):
+    """Start a bulk part import from a CSV or JSONL upload"""
+    if not auth_handler.access_token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    try:
+        fmt = detect_format(file.filename or "")
+    except BulkImportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Spool the upload to disk so the job can stream it and resume later
+    checkpoint_dir = BULK_IMPORT_CONFIG['checkpoint_dir']
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    source_path = os.path.join(checkpoint_dir, f"{os.urandom(8).hex()}_{os.path.basename(file.filename)}")
+    with open(source_path, 'wb') as f:
+        while chunk := await file.read(1024 * 1024):
+            f.write(chunk)
+
+    job = BulkImportJob(chatbot.plm_client, source_path, fmt=fmt, delete_source_on_complete=True)
+    job.save_checkpoint()
+    _start_import_job(job)
+    return job.status()
+
+@app.get("/imports/{job_id}")
+async def get_import_status(job_id: str):
+    """Get progress and throughput for a bulk import job"""
+    if not auth_handler.access_token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    return _get_import_job(job_id).status()
+
+@app.post("/imports/{job_id}/resume")
+async def resume_import(job_id: str):
+    """Resume an interrupted or cancelled bulk import job"""
+    if not auth_handler.access_token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    job = _get_import_job(job_id)
+    _start_import_job(job)
+    return job.status()
+
+@app.post("/imports/{job_id}/cancel")
+async def cancel_import(job_id: str):
+    """Cancel a running bulk import job; it can be resumed later"""
+    if not auth_handler.access_token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    job = _get_import_job(job_id)
+    job.cancel()
+    return job.status()
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Guard admin routes with the configured admin token"""
+    if not PROFILING_CONFIG['admin_token']:
+        raise HTTPException(status_code=403, detail="Admin routes are disabled; set PROFILING_ADMIN_TOKEN")
+    if not _is_admin_token(x_admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.get("/admin/profiling", dependencies=[Depends(require_admin)])
+async def get_profiling_settings():
+    """Get current profiling settings"""
+    return {key: value for key, value in PROFILING_CONFIG.items() if key != 'admin_token'}
+
+@app.post("/admin/profiling", dependencies=[Depends(require_admin)])
+async def update_profiling_settings(settings: ProfilingSettings):
+    """Enable/disable profiling or adjust its settings at runtime"""
+    PROFILING_CONFIG.update(settings.model_dump(exclude_none=True))
+    return {key: value for key, value in PROFILING_CONFIG.items() if key != 'admin_token'}
+
+@app.get("/admin/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """List captured request profiles, newest first"""
+    return {"profiles": profile_store.list()}
+
+@app.delete("/admin/profiles", dependencies=[Depends(require_admin)])
+async def clear_profiles():
+    """Discard all captured profiles"""
+    profile_store.clear()
+    return {"message": "Profiles cleared"}
+
+@app.get("/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_profile(profile_id: str):
+    """Get the span breakdown for a captured profile"""
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return profile.to_dict()
+
+@app.get("/admin/profiles/{profile_id}/collapsed", dependencies=[Depends(require_admin)])
+async def download_profile_stacks(profile_id: str):
+    """Download collapsed stacks for flamegraph.pl or speedscope"""
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return PlainTextResponse(
+        profile.collapsed(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.collapsed"'}
+    )
@@ -0,0 +1,343 @@
+"""
+Bulk part import/update pipeline for OpenBOM.
+
+Streams rows from a CSV or JSONL file, diffs each row against the current
+part data so unchanged parts are skipped, and uploads creates/updates with
+bounded parallelism. Progress is checkpointed so interrupted jobs can resume.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+from .plm_client import OpenBOMClient
+from .config.config import BULK_IMPORT_CONFIG
+
+SUPPORTED_FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+
+# Row outcomes
+CREATED = 'created'
+UPDATED = 'updated'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+
+
+class BulkImportError(Exception):
+    """Raised when a bulk import job cannot be started or resumed"""
+
+
+def detect_format(filename: str) -> str:
+    """Map a file name to a supported input format"""
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in SUPPORTED_FORMATS:
+        raise BulkImportError(
+            f"Unsupported file type '{ext}'; expected one of {', '.join(SUPPORTED_FORMATS)}"
+        )
+    return SUPPORTED_FORMATS[ext]
+
+
+def _normalize(value: Any) -> str:
+    """Normalize a field value so CSV strings compare equal to API values"""
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True)
+    return str(value).strip()
+
+
+class BulkImportJob:
+    """A resumable bulk create/update job over a CSV or JSONL file"""
+
+    def __init__(self, client: OpenBOMClient, source_path: str, fmt: Optional[str] = None,
+                 job_id: Optional[str] = None, max_workers: Optional[int] = None,
+                 checkpoint_dir: Optional[str] = None, delete_source_on_complete: bool = False):
+        self.client = client
+        self.source_path = source_path
+        # Set for uploads spooled by the API, which nothing else cleans up
+        self.delete_source_on_complete = delete_source_on_complete
+        self.format = fmt or detect_format(source_path)
+        self.job_id = job_id or uuid.uuid4().hex
+        self.max_workers = max_workers or BULK_IMPORT_CONFIG['max_workers']
+        self.checkpoint_dir = checkpoint_dir or BULK_IMPORT_CONFIG['checkpoint_dir']
+        self.checkpoint_interval = BULK_IMPORT_CONFIG['checkpoint_interval']
+        self.max_errors_reported = BULK_IMPORT_CONFIG['max_errors_reported']
+
+        self.state = 'pending'
+        # Rows below this index are fully processed and never re-sent on resume
+        self.committed_offset = 0
+        self.counts = {CREATED: 0, UPDATED: 0, SKIPPED: 0, FAILED: 0}
+        self.errors: List[Dict[str, Any]] = []
+        self.total_bytes = os.path.getsize(source_path) if os.path.exists(source_path) else 0
+        self.bytes_read = 0
+        self.in_flight = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._rows_this_run = 0
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+
+    @property
+    def checkpoint_path(self) -> str:
+        return os.path.join(self.checkpoint_dir, f"{self.job_id}.json")
+
+    @classmethod
+    def load(cls, client: OpenBOMClient, job_id: str,
+             checkpoint_dir: Optional[str] = None) -> 'BulkImportJob':
+        """Restore a job from its checkpoint file"""
+        checkpoint_dir = checkpoint_dir or BULK_IMPORT_CONFIG['checkpoint_dir']
+        path = os.path.join(checkpoint_dir, f"{job_id}.json")
+        if not os.path.exists(path):
+            raise BulkImportError(f"No checkpoint found for import job {job_id}")
+        with open(path) as f:
+            data = json.load(f)
+
+        job = cls(client, data['source_path'], fmt=data['format'], job_id=job_id,
+                  max_workers=data.get('max_workers'), checkpoint_dir=checkpoint_dir,
+                  delete_source_on_complete=data.get('delete_source_on_complete', False))
+        job.state = data['state']
+        job.committed_offset = data['committed_offset']
+        job.counts.update(data['counts'])
+        job.errors = data.get('errors', [])
+        return job
+
+    def save_checkpoint(self):
+        """Atomically persist job progress"""
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        with self._lock:
+            data = {
+                'job_id': self.job_id,
+                'source_path': self.source_path,
+                'format': self.format,
+                'max_workers': self.max_workers,
+                'delete_source_on_complete': self.delete_source_on_complete,
+                'state': self.state,
+                'committed_offset': self.committed_offset,
+                'counts': dict(self.counts),
+                'errors': list(self.errors),
+            }
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def cancel(self):
+        """Stop submitting rows; in-flight rows finish and progress is checkpointed"""
+        # Ignored unless running, so a stale flag can't stop the next resume
+        with self._lock:
+            if self.state == 'running':
+                self._cancel.set()
+
+    def status(self) -> Dict[str, Any]:
+        """Progress and throughput snapshot for the API"""
+        with self._lock:
+            end = self.finished_at or time.time()
+            elapsed = end - self.started_at if self.started_at else 0.0
+            return {
+                'job_id': self.job_id,
+                'state': self.state,
+                'format': self.format,
+                'rows_processed': self.committed_offset,
+                'rows_in_flight': self.in_flight,
+                'counts': dict(self.counts),
+                'bytes_read': self.bytes_read,
+                'total_bytes': self.total_bytes,
+                'percent_complete': round(100.0 * self.bytes_read / self.total_bytes, 1)
+                if self.total_bytes else None,
+                'elapsed_seconds': round(elapsed, 2),
+                'rows_per_second': round(self._rows_this_run / elapsed, 2) if elapsed else 0.0,
+                'errors': list(self.errors),
+            }
+
+    def _read_lines(self, f) -> Iterator[str]:
+        """Yield decoded lines while tracking how much of the file has been read"""
+        for i, raw in enumerate(f):
+            self.bytes_read += len(raw)
+            line = raw.decode('utf-8')
+            yield line.lstrip('\ufeff') if i == 0 else line
+
+    def _iter_rows(self) -> Iterator[Tuple[int, Any]]:
+        """Stream (row_index, row) pairs from the source file"""
+        with open(self.source_path, 'rb') as f:
+            lines = self._read_lines(f)
+            if self.format == 'csv':
+                for index, row in enumerate(csv.DictReader(lines)):
+                    yield index, row
+            else:
+                index = 0
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    try:
+                        yield index, json.loads(line)
+                    except ValueError as e:
+                        yield index, ValueError(f"Invalid JSON: {str(e)}")
+                    index += 1
+
+    def _validate(self, row: Any) -> Dict[str, Any]:
+        """Validate a row and return its cleaned field values"""
+        if isinstance(row, Exception):
+            raise row
+        if not isinstance(row, dict):
+            raise ValueError("Row must be an object")
+        cleaned = {
+            key.strip(): value for key, value in row.items()
+            if key is not None and key.strip() and value not in (None, "")
+        }
+        if not _normalize(cleaned.get('part_number')):
+            raise ValueError("Missing required field 'part_number'")
+        cleaned['part_number'] = _normalize(cleaned['part_number'])
+        return cleaned
+
+    @staticmethod
+    def _part_key(row: Any) -> Optional[str]:
+        """Part number of a raw row, used to keep rows for one part in file order"""
+        if not isinstance(row, dict):
+            return None
+        for key, value in row.items():
+            if key is not None and key.strip() == 'part_number':
+                return _normalize(value) or None
+        return None
+
+    def _idempotency_key(self, index: int, payload: Dict[str, Any]) -> str:
+        """Stable key so a row re-sent after a resume is applied at most once"""
+        digest = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+        return f"{self.job_id}-{index}-{digest[:16]}"
+
+    def _process_row(self, index: int, row: Any) -> Tuple[str, Optional[str]]:
+        """Validate, diff and upload a single row; returns (outcome, error)"""
+        try:
+            part_data = self._validate(row)
+        except ValueError as e:
+            return FAILED, str(e)
+
+        part_number = part_data['part_number']
+        current = self.client.get_part_details(part_number, include_bom=False)
+
+        if current.get('error'):
+            if current.get('status_code') != 404:
+                return FAILED, current['error']
+            result = self.client.create_part(part_data, idempotency_key=self._idempotency_key(index, part_data))
+            return (FAILED, result['error']) if result.get('error') else (CREATED, None)
+
+        changes = {
+            key: value for key, value in part_data.items()
+            if key != 'part_number' and _normalize(current.get(key)) != _normalize(value)
+        }
+        if not changes:
+            return SKIPPED, None
+
+        result = self.client.update_part(part_number, changes,
+                                         idempotency_key=self._idempotency_key(index, changes))
+        return (FAILED, result['error']) if result.get('error') else (UPDATED, None)
+
+    def _process_after(self, previous: Optional[Future], index: int, row: Any) -> Tuple[str, Optional[str]]:
+        """
+        Process a row once the previous row for the same part has finished, so
+        repeated part numbers are diffed and written in file order. The earlier
+        row was submitted first, so it is always running or queued ahead of us
+        """
+        if previous is not None:
+            wait([previous])
+        return self._process_row(index, row)
+
+    def _record(self, index: int, outcome: str, error: Optional[str]):
+        """Fold a finished row into the counters (caller holds the lock)"""
+        self.counts[outcome] += 1
+        if error and len(self.errors) < self.max_errors_reported:
+            self.errors.append({'row': index, 'error': error})
+
+    def start(self) -> threading.Thread:
+        """
+        Mark the job running and run it on a background thread. The state is
+        set before returning so callers can't start the same job twice
+        """
+        with self._lock:
+            if self.state == 'running':
+                raise BulkImportError(f"Import job {self.job_id} is already running")
+            if self.state == 'completed':
+                raise BulkImportError(f"Import job {self.job_id} has already completed")
+            self.state = 'running'
+            self._cancel.clear()
+        thread = threading.Thread(target=self.run, name=f"bulk-import-{self.job_id}", daemon=True)
+        thread.start()
+        return thread
+
+    def run(self):
+        """Run the job to completion, resuming from the last checkpoint"""
+        if self.state == 'completed':
+            return
+        self.state = 'running'
+        self.started_at = time.time()
+        self.finished_at = None
+        self._rows_this_run = 0
+        # The file is re-read from the start, so progress is recounted too
+        self.bytes_read = 0
+
+        # Finished rows wait here until every row before them is done, so the
+        # checkpointed offset never skips a row that is still in flight
+        done: Dict[int, Tuple[str, Optional[str]]] = {}
+        pending = {}
+        # Latest unfinished future per part number, and the reverse mapping
+        part_tails: Dict[str, Future] = {}
+        future_parts: Dict[Future, str] = {}
+        since_checkpoint = 0
+        max_in_flight = self.max_workers * 2
+
+        def drain(block: bool):
+            nonlocal since_checkpoint
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED, timeout=None if block else 0)
+            for future in finished:
+                index = pending.pop(future)
+                part_key = future_parts.pop(future, None)
+                if part_key is not None and part_tails.get(part_key) is future:
+                    del part_tails[part_key]
+                try:
+                    done[index] = future.result()
+                except Exception as e:
+                    done[index] = (FAILED, str(e))
+            with self._lock:
+                self.in_flight = len(pending)
+                while self.committed_offset in done:
+                    self._record(self.committed_offset, *done.pop(self.committed_offset))
+                    self.committed_offset += 1
+                    self._rows_this_run += 1
+                    since_checkpoint += 1
+            if since_checkpoint >= self.checkpoint_interval:
+                self.save_checkpoint()
+                since_checkpoint = 0
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for index, row in self._iter_rows():
+                    if self._cancel.is_set():
+                        break
+                    if index < self.committed_offset:
+                        continue
+                    while len(pending) >= max_in_flight:
+                        drain(block=True)
+                    part_key = self._part_key(row)
+                    future = executor.submit(self._process_after, part_tails.get(part_key), index, row)
+                    pending[future] = index
+                    if part_key is not None:
+                        part_tails[part_key] = future
+                        future_parts[future] = part_key
+                    with self._lock:
+                        self.in_flight = len(pending)
+                while pending:
+                    drain(block=True)
+            self.state = 'cancelled' if self._cancel.is_set() else 'completed'
+        except Exception as e:
+            self.state = 'failed'
+            with self._lock:
+                self.errors.append({'row': None, 'error': str(e)})
+        finally:
+            self.finished_at = time.time()
+            self._cancel.clear()
+            self.save_checkpoint()
+        if self.state == 'completed' and self.delete_source_on_complete and os.path.exists(self.source_path):
+            os.remove(self.source_path)
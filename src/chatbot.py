@@ -1,20 +1,18 @@
-from typing import List, Dict, Any, Optional
-from langchain_openai import ChatOpenAI
+from typing import List, Dict, Any, Optional, Tuple
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
-from .config.config import CHATBOT_CONFIG
+from .config.config import CHATBOT_CONFIG, RESULTS_CONFIG
 from .plm_client import OpenBOMClient
 from .auth import OpenBOMAuth
+from .model_cascade import ModelCascade
+from .profiling import traced
+import json
 import re
 
 class ChatBot:
-    def __init__(self, auth_handler: OpenBOMAuth):
+    def __init__(self, auth_handler: OpenBOMAuth, model_cascade: Optional[ModelCascade] = None):
         self.auth_handler = auth_handler
         self.plm_client = OpenBOMClient(auth_handler)
-        self.chat_model = ChatOpenAI(
-            model_name=CHATBOT_CONFIG['model'],
-            openai_api_key=CHATBOT_CONFIG['api_key'],
-            temperature=CHATBOT_CONFIG['temperature']
-        )
+        self.model_cascade = model_cascade or ModelCascade.from_config()
         self.conversation_history: List[Dict[str, str]] = []
         self.system_prompt = f"""You are a helpful assistant specialized in providing information about parts and products from OpenBOM. 
         You can:
@@ -34,6 +32,7 @@ class ChatBot:
         - Recent changes or updates
         """
 
+    @traced("chatbot._get_part_context")
     def _get_part_context(self, query: str) -> str:
         """
         Get relevant part information from OpenBOM based on the query
@@ -77,6 +76,7 @@ class ChatBot:
 
         return "\n".join(context) if context else "No specific part information found."
 
+    @traced("chatbot.process_message")
     def process_message(self, user_message: str) -> str:
         """
         Process a user message and return a response
@@ -100,8 +100,8 @@ class ChatBot:
         # Add the current user message
         messages.append(HumanMessage(content=user_message))
         
-        # Get response from the chat model
-        response = self.chat_model.invoke(messages)
+        # Get response from the model tier the cascade picks for this turn
+        response = self.model_cascade.invoke(messages, user_message, part_context)
         
         # Update conversation history
         self.conversation_history.append({"role": "user", "content": user_message})
@@ -117,20 +117,29 @@ class ChatBot:
 
     async def handle_message(self, message: str) -> str:
         """Process user message and return response"""
+        response, _ = await self.handle_message_with_result(message)
+        return response
+
+    @traced("chatbot.handle_message")
+    async def handle_message_with_result(self, message: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Process user message and return the text response plus, for list and
+        detail answers, a structured result the web UI renders as a table
+        """
         try:
             # Check if user is asking about BOMs
             if re.search(r'boms?|bill of materials?', message.lower()):
                 boms = self.plm_client.get_boms()
                 if boms:
-                    return self._format_bom_list(boms)
-                return "I couldn't find any BOMs at the moment."
+                    return self._format_bom_list(boms), self._bom_list_result(boms)
+                return "I couldn't find any BOMs at the moment.", None
                 
             # Check if user is asking about catalogs
             if re.search(r'catalogs?|parts?', message.lower()):
                 catalogs = self.plm_client.get_catalogs()
                 if catalogs:
-                    return self._format_catalog_list(catalogs)
-                return "I couldn't find any catalogs at the moment."
+                    return self._format_catalog_list(catalogs), self._catalog_list_result(catalogs)
+                return "I couldn't find any catalogs at the moment.", None
                 
             # Check if user is asking about a specific part number
             part_match = re.search(r'part (\w+)', message.lower())
@@ -138,38 +147,77 @@ class ChatBot:
                 part_number = part_match.group(1)
                 part_details = self.plm_client.get_part_details(part_number)
                 if part_details and not part_details.get('error'):
-                    return self._format_part_details(part_details)
-                return f"I couldn't find details for part {part_number}."
+                    return self._format_part_details(part_details), self._part_details_result(part_details)
+                return f"I couldn't find details for part {part_number}.", None
                 
-            return "I can help you with information about BOMs, catalogs, and specific parts. What would you like to know?"
+            return "I can help you with information about BOMs, catalogs, and specific parts. What would you like to know?", None
             
         except Exception as e:
-            return f"I encountered an error: {str(e)}"
+            return f"I encountered an error: {str(e)}", None
+
+    def _format_list(self, title: str, items: List[Dict], default_name: str) -> str:
+        """Format a named list as text, previewing only the first rows of large lists"""
+        limit = RESULTS_CONFIG['text_preview_rows']
+        lines = [title]
+        lines.extend(
+            f"- {item.get('name', default_name)} (ID: {item.get('id', 'N/A')})"
+            for item in items[:limit]
+        )
+        if len(items) > limit:
+            lines.append(f"...and {len(items) - limit} more")
+        return "\n".join(lines) + "\n"
             
+    @traced("chatbot._format_bom_list")
     def _format_bom_list(self, boms: List[Dict]) -> str:
         """Format BOM list into readable text"""
         if not boms:
             return "No BOMs found."
-            
-        response = "Here are the available BOMs:\n"
-        for bom in boms:
-            response += f"- {bom.get('name', 'Unnamed BOM')} (ID: {bom.get('id', 'N/A')})\n"
-        return response
+        return self._format_list(f"Here are the available BOMs ({len(boms)}):", boms, 'Unnamed BOM')
         
+    @traced("chatbot._format_catalog_list")
     def _format_catalog_list(self, catalogs: List[Dict]) -> str:
         """Format catalog list into readable text"""
         if not catalogs:
             return "No catalogs found."
-            
-        response = "Here are the available catalogs:\n"
-        for catalog in catalogs:
-            response += f"- {catalog.get('name', 'Unnamed Catalog')} (ID: {catalog.get('id', 'N/A')})\n"
-        return response
+        return self._format_list(
+            f"Here are the available catalogs ({len(catalogs)}):", catalogs, 'Unnamed Catalog'
+        )
         
+    @traced("chatbot._format_part_details")
     def _format_part_details(self, part: Dict) -> str:
         """Format part details into readable text"""
-        response = f"Part Details:\n"
-        for key, value in part.items():
-            if key not in ['id', '_id']:
-                response += f"- {key}: {value}\n"
-        return response 
\ No newline at end of file
+        lines = ["Part Details:"]
+        lines.extend(f"- {key}: {value}" for key, value in part.items() if key not in ['id', '_id'])
+        return "\n".join(lines) + "\n"
+
+    def _bom_list_result(self, boms: List[Dict]) -> Dict[str, Any]:
+        """Structured BOM list; rows expand via paged /boms/{id}/items"""
+        return {
+            "type": "bom_list",
+            "columns": ["name", "id"],
+            "rows": [{"name": bom.get('name', 'Unnamed BOM'), "id": bom.get('id')} for bom in boms],
+            "total": len(boms),
+            "expand_url": "/boms/{id}/items"
+        }
+
+    def _catalog_list_result(self, catalogs: List[Dict]) -> Dict[str, Any]:
+        """Structured catalog list; rows expand via paged /catalogs/{id}/items"""
+        return {
+            "type": "catalog_list",
+            "columns": ["name", "id"],
+            "rows": [
+                {"name": catalog.get('name', 'Unnamed Catalog'), "id": catalog.get('id')}
+                for catalog in catalogs
+            ],
+            "total": len(catalogs),
+            "expand_url": "/catalogs/{id}/items"
+        }
+
+    def _part_details_result(self, part: Dict) -> Dict[str, Any]:
+        """Structured part details as property/value rows"""
+        rows = [
+            {"property": key, "value": value if isinstance(value, (str, int, float, bool)) or value is None
+             else json.dumps(value, default=str)}
+            for key, value in part.items() if key not in ['id', '_id']
+        ]
+        return {"type": "part_details", "columns": ["property", "value"], "rows": rows, "total": len(rows)}
@@ -27,6 +27,57 @@ CHATBOT_CONFIG = {
     'max_history_length': int(os.getenv('MAX_HISTORY_LENGTH', 10))
 }
 
+# Model Cascade Configuration
+# Simple turns go to 'fast_model'; complex or low-confidence turns use CHATBOT_CONFIG['model']
+MODEL_CASCADE_CONFIG = {
+    'enabled': os.getenv('MODEL_CASCADE_ENABLED', 'True').lower() == 'true',
+    'fast_model': os.getenv('OPENAI_FAST_MODEL', 'gpt-4o-mini'),
+    'fast_cost_per_1k_tokens': float(os.getenv('OPENAI_FAST_COST_PER_1K', 0.0003)),
+    'large_cost_per_1k_tokens': float(os.getenv('OPENAI_COST_PER_1K', 0.045)),
+    'max_simple_words': int(os.getenv('MODEL_CASCADE_MAX_SIMPLE_WORDS', 25)),
+    'max_simple_context_chars': int(os.getenv('MODEL_CASCADE_MAX_SIMPLE_CONTEXT_CHARS', 4000)),
+    'min_answer_chars': int(os.getenv('MODEL_CASCADE_MIN_ANSWER_CHARS', 10)),
+    'complex_keywords': [word.strip().lower() for word in os.getenv(
+        'MODEL_CASCADE_COMPLEX_KEYWORDS',
+        'why,explain,compare,difference,analy,impact,recommend,suggest,tradeoff,'
+        'trade-off,optimi,design,calculat,estimate,summariz,cost,risk,alternative'
+    ).split(',') if word.strip()],
+    'low_confidence_phrases': [phrase.strip().lower() for phrase in os.getenv(
+        'MODEL_CASCADE_LOW_CONFIDENCE_PHRASES',
+        "i'm not sure,i am not sure,i don't know,i do not know,cannot determine,"
+        "can't determine,unable to,not enough information,unclear"
+    ).split(',') if phrase.strip()]
+}
+
+# Structured Result Configuration
+RESULTS_CONFIG = {
+    'text_preview_rows': int(os.getenv('RESULTS_TEXT_PREVIEW_ROWS', 20)),  # list rows included in chat text
+    'stream_chunk_rows': int(os.getenv('RESULTS_STREAM_CHUNK_ROWS', 500)),
+    'page_size': int(os.getenv('RESULTS_PAGE_SIZE', 200)),
+    'max_page_size': int(os.getenv('RESULTS_MAX_PAGE_SIZE', 1000)),
+    # Full BOM/catalog item lists are cached so paging doesn't refetch them
+    'list_cache_ttl': int(os.getenv('RESULTS_LIST_CACHE_TTL', 60)),  # seconds
+    'list_cache_size': int(os.getenv('RESULTS_LIST_CACHE_SIZE', 32))
+}
+
+# Bulk Part Import Configuration
+BULK_IMPORT_CONFIG = {
+    'max_workers': int(os.getenv('BULK_IMPORT_MAX_WORKERS', 8)),
+    'checkpoint_dir': os.getenv('BULK_IMPORT_CHECKPOINT_DIR', '.bulk_imports'),
+    'checkpoint_interval': int(os.getenv('BULK_IMPORT_CHECKPOINT_INTERVAL', 100)),  # rows
+    'max_errors_reported': int(os.getenv('BULK_IMPORT_MAX_ERRORS_REPORTED', 100))
+}
+
+# Request Profiling Configuration (mutable at runtime via /admin/profiling)
+PROFILING_CONFIG = {
+    'enabled': os.getenv('PROFILING_ENABLED', 'False').lower() == 'true',
+    'profile_all': False,  # capture every request, not only opted-in or slow ones
+    'sample_interval_ms': float(os.getenv('PROFILING_SAMPLE_INTERVAL_MS', 5)),
+    'slow_request_threshold_ms': float(os.getenv('PROFILING_SLOW_REQUEST_MS', 2000)),
+    'max_profiles': int(os.getenv('PROFILING_MAX_PROFILES', 50)),
+    'admin_token': os.getenv('PROFILING_ADMIN_TOKEN')
+}
+
 # Logging Configuration
 LOGGING_CONFIG = {
     'level': os.getenv('LOG_LEVEL', 'INFO'),
@@ -0,0 +1,155 @@
+"""
+Tiered model cascade for chat completion.
+
+Simple, context-answerable turns go to a fast, cheap model; complex turns and
+fast-tier answers showing low-confidence signals are escalated to the large
+model. Per-tier latency and cost statistics are tracked for tuning the rules.
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, List, Sequence
+from langchain_openai import ChatOpenAI
+from langchain_core.messages import BaseMessage
+from .config.config import CHATBOT_CONFIG, MODEL_CASCADE_CONFIG
+from .profiling import span
+
+
+class ModelTier:
+    """A chat model plus the running statistics for calls routed to it"""
+
+    def __init__(self, name: str, model: Any, cost_per_1k_tokens: float = 0.0,
+                 latency_window: int = 500):
+        self.name = name
+        # Any object with invoke(messages) -> message, so tests can pass a fake model
+        self.model = model
+        self.cost_per_1k_tokens = cost_per_1k_tokens
+        self.calls = 0
+        self.errors = 0
+        self.total_tokens = 0
+        self.total_latency_ms = 0.0
+        self._latencies: deque = deque(maxlen=latency_window)
+        self._lock = threading.Lock()
+
+    def invoke(self, messages: Sequence[BaseMessage]):
+        start = time.perf_counter()
+        try:
+            with span(f"llm.{self.name}"):
+                response = self.model.invoke(messages)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+        latency_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.calls += 1
+            self.total_latency_ms += latency_ms
+            self._latencies.append(latency_ms)
+            self.total_tokens += _token_count(response)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                'model': getattr(self.model, 'model_name', type(self.model).__name__),
+                'calls': self.calls,
+                'errors': self.errors,
+                'avg_latency_ms': round(self.total_latency_ms / self.calls, 1) if self.calls else None,
+                'p50_latency_ms': round(_percentile(latencies, 50), 1) if latencies else None,
+                'p95_latency_ms': round(_percentile(latencies, 95), 1) if latencies else None,
+                'total_tokens': self.total_tokens,
+                'estimated_cost': round(self.total_tokens / 1000 * self.cost_per_1k_tokens, 4),
+            }
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _token_count(response: Any) -> int:
+    """Read total token usage from a LangChain response, if the model reports it"""
+    usage = getattr(response, 'usage_metadata', None) or {}
+    if usage.get('total_tokens'):
+        return usage['total_tokens']
+    metadata = getattr(response, 'response_metadata', None) or {}
+    return (metadata.get('token_usage') or {}).get('total_tokens', 0)
+
+
+class ModelCascade:
+    """Routes each turn to the fast tier or the large tier"""
+
+    def __init__(self, fast: ModelTier, large: ModelTier, rules: Optional[Dict[str, Any]] = None):
+        self.fast = fast
+        self.large = large
+        self.rules = rules if rules is not None else MODEL_CASCADE_CONFIG
+        self.routed = {'fast': 0, 'large': 0}
+        self.escalations = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> 'ModelCascade':
+        """Build the default OpenAI-backed cascade from configuration"""
+        def tier(name: str, model_name: str, cost: float) -> ModelTier:
+            model = ChatOpenAI(
+                model_name=model_name,
+                openai_api_key=CHATBOT_CONFIG['api_key'],
+                temperature=CHATBOT_CONFIG['temperature']
+            )
+            return ModelTier(name, model, cost_per_1k_tokens=cost)
+
+        return cls(
+            tier('fast', MODEL_CASCADE_CONFIG['fast_model'], MODEL_CASCADE_CONFIG['fast_cost_per_1k_tokens']),
+            tier('large', CHATBOT_CONFIG['model'], MODEL_CASCADE_CONFIG['large_cost_per_1k_tokens'])
+        )
+
+    def is_simple(self, user_message: str, context: str) -> bool:
+        """Whether a turn looks answerable by the fast tier"""
+        if not self.rules['enabled']:
+            return False
+        if len(user_message.split()) > self.rules['max_simple_words']:
+            return False
+        if len(context) > self.rules['max_simple_context_chars']:
+            return False
+        text = user_message.lower()
+        return not any(re.search(rf"\b{re.escape(word)}", text) for word in self.rules['complex_keywords'])
+
+    def is_low_confidence(self, content: str) -> bool:
+        """Whether a fast-tier answer should be retried on the large tier"""
+        if len(content.strip()) < self.rules['min_answer_chars']:
+            return True
+        text = content.lower()
+        return any(phrase in text for phrase in self.rules['low_confidence_phrases'])
+
+    def invoke(self, messages: Sequence[BaseMessage], user_message: str, context: str):
+        """Get a completion, starting on the fast tier when the turn is simple"""
+        if self.is_simple(user_message, context):
+            try:
+                response = self.fast.invoke(messages)
+                if not self.is_low_confidence(response.content):
+                    with self._lock:
+                        self.routed['fast'] += 1
+                    return response
+            except Exception as e:
+                print(f"Fast model failed, escalating: {str(e)}")
+            with self._lock:
+                self.escalations += 1
+
+        response = self.large.invoke(messages)
+        with self._lock:
+            self.routed['large'] += 1
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            routed = dict(self.routed)
+            escalations = self.escalations
+        return {
+            'enabled': self.rules['enabled'],
+            'answered_by': routed,
+            'escalations': escalations,
+            'tiers': {'fast': self.fast.stats(), 'large': self.large.stats()},
+        }
@@ -1,14 +1,20 @@
 import os
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Dict, Any, Optional, List
 from .auth import OpenBOMAuth
-from .config.config import OPENBOM_API_CONFIG
+from .config.config import OPENBOM_API_CONFIG, BULK_IMPORT_CONFIG
+from .profiling import traced
 
 class OpenBOMClient:
     def __init__(self, auth_handler: OpenBOMAuth):
         self.auth_handler = auth_handler
         self.base_url = OPENBOM_API_CONFIG['base_url']
         self.session = requests.Session()
+        # Size the connection pool so parallel bulk uploads don't queue on it
+        adapter = HTTPAdapter(pool_maxsize=max(10, BULK_IMPORT_CONFIG['max_workers']))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self._setup_session()
 
     def _setup_session(self):
@@ -22,6 +28,7 @@ class OpenBOMClient:
         """Refresh session headers with current auth token"""
         self._setup_session()
 
+    @traced("openbom.get_boms")
     def get_boms(self) -> Optional[list]:
         """Get list of BOMs"""
         try:
@@ -33,6 +40,7 @@ class OpenBOMClient:
             print(f"Error getting BOMs: {str(e)}")
             return None
 
+    @traced("openbom.get_catalogs")
     def get_catalogs(self) -> Optional[list]:
         """Get list of catalogs"""
         try:
@@ -44,6 +52,7 @@ class OpenBOMClient:
             print(f"Error getting catalogs: {str(e)}")
             return None
 
+    @traced("openbom.get_bom_details")
     def get_bom_details(self, bom_id: str) -> Optional[dict]:
         """Get details of a specific BOM"""
         try:
@@ -55,12 +64,33 @@ class OpenBOMClient:
             print(f"Error getting BOM details: {str(e)}")
             return None
 
-    def get_part_details(self, part_number: str) -> Dict[str, Any]:
+    @traced("openbom.get_bom_items")
+    def get_bom_items(self, bom_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the line items of a BOM as one dict per line
+
+        OpenBOM returns BOM lines as a 'columns' header plus a 'cells' row
+        matrix; older payloads carry a list of line dicts instead.
+        """
+        details = self.get_bom_details(bom_id)
+        if details is None:
+            return None
+        if isinstance(details.get('cells'), list) and isinstance(details.get('columns'), list):
+            columns = details['columns']
+            return [dict(zip(columns, cells)) for cells in details['cells']]
+        for key in ('items', 'lines', 'rows', 'children'):
+            if isinstance(details.get(key), list):
+                return details[key]
+        return []
+
+    @traced("openbom.get_part_details")
+    def get_part_details(self, part_number: str, include_bom: bool = True) -> Dict[str, Any]:
         """
         Retrieve details for a specific part number from OpenBOM
         
         Args:
             part_number: The unique identifier for the part
+            include_bom: Whether to also fetch the part's BOM structure
             
         Returns:
             Dict containing part details including:
@@ -75,14 +105,17 @@ class OpenBOMClient:
             part_info = response.json()
 
             # Get BOM structure if available
-            bom_response = self.session.get(f"{self.base_url}/parts/{part_number}/bom")
-            if bom_response.status_code == 200:
-                part_info['bom_structure'] = bom_response.json()
+            if include_bom:
+                bom_response = self.session.get(f"{self.base_url}/parts/{part_number}/bom")
+                if bom_response.status_code == 200:
+                    part_info['bom_structure'] = bom_response.json()
 
             return part_info
         except requests.exceptions.RequestException as e:
-            return {"error": str(e)}
+            status_code = e.response.status_code if e.response is not None else None
+            return {"error": str(e), "status_code": status_code}
 
+    @traced("openbom.search_parts")
     def search_parts(self, query: str, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Search for parts in OpenBOM based on query and filters
@@ -109,6 +142,7 @@ class OpenBOMClient:
         except requests.exceptions.RequestException as e:
             return {"error": str(e)}
 
+    @traced("openbom.get_part_availability")
     def get_part_availability(self, part_number: str) -> Dict[str, Any]:
         """
         Get inventory and availability information for a part
@@ -123,6 +157,7 @@ class OpenBOMClient:
         except requests.exceptions.RequestException as e:
             return {"error": str(e)}
 
+    @traced("openbom.get_part_documentation")
     def get_part_documentation(self, part_number: str) -> Dict[str, Any]:
         """
         Get documentation and attachments related to a part
@@ -137,6 +172,7 @@ class OpenBOMClient:
         except requests.exceptions.RequestException as e:
             return {"error": str(e)}
 
+    @traced("openbom.get_catalog_items")
     def get_catalog_items(self, catalog_id: str) -> List[Dict[str, Any]]:
         """Get items from a specific catalog"""
         try:
@@ -146,24 +182,40 @@ class OpenBOMClient:
         except requests.exceptions.RequestException as e:
             return [{"error": str(e)}]
 
-    def create_part(self, part_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _idempotency_headers(self, idempotency_key: Optional[str]) -> Dict[str, str]:
+        """Build per-request headers carrying an optional idempotency key"""
+        return {"Idempotency-Key": idempotency_key} if idempotency_key else {}
+
+    @traced("openbom.create_part")
+    def create_part(self, part_data: Dict[str, Any], idempotency_key: Optional[str] = None) -> Dict[str, Any]:
         """Create a new part in OpenBOM"""
         try:
-            response = self.session.post(f"{self.base_url}/parts", json=part_data)
+            response = self.session.post(
+                f"{self.base_url}/parts",
+                json=part_data,
+                headers=self._idempotency_headers(idempotency_key)
+            )
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             return {"error": str(e)}
 
-    def update_part(self, part_number: str, part_data: Dict[str, Any]) -> Dict[str, Any]:
+    @traced("openbom.update_part")
+    def update_part(self, part_number: str, part_data: Dict[str, Any],
+                    idempotency_key: Optional[str] = None) -> Dict[str, Any]:
         """Update an existing part in OpenBOM"""
         try:
-            response = self.session.put(f"{self.base_url}/parts/{part_number}", json=part_data)
+            response = self.session.put(
+                f"{self.base_url}/parts/{part_number}",
+                json=part_data,
+                headers=self._idempotency_headers(idempotency_key)
+            )
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             return {"error": str(e)}
 
+    @traced("openbom.get_change_history")
     def get_change_history(self, part_number: str) -> List[Dict[str, Any]]:
         """Get change history for a part"""
         try:
@@ -0,0 +1,225 @@
+"""
+On-demand request profiling for the PLM Chatbot.
+
+Provides a low-overhead sampling profiler, lightweight timing spans, and an
+in-memory store of captured profiles. Profiles are exported as collapsed
+stacks, which flamegraph.pl and speedscope render directly as flame graphs.
+"""
+
+import contextvars
+import functools
+import inspect
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List
+from .config.config import PROFILING_CONFIG
+
+# Spans recorded for the request currently being handled, if it is traced
+_current_spans: contextvars.ContextVar[Optional[List[Dict[str, Any]]]] = \
+    contextvars.ContextVar('current_spans', default=None)
+_current_depth: contextvars.ContextVar[int] = contextvars.ContextVar('current_depth', default=0)
+_trace_start: contextvars.ContextVar[float] = contextvars.ContextVar('trace_start', default=0.0)
+
+# In-flight requests, tracked so profiles can report how many requests shared
+# the sampled event loop thread with them
+_active_lock = threading.Lock()
+_active_profiles: set = set()
+_inflight_requests = 0
+
+# Floor for the sampling interval; a zero wait would busy-spin the sampler
+MIN_SAMPLE_INTERVAL = 0.001
+
+
+class SamplingProfiler:
+    """
+    Samples the call stack of one thread at a fixed interval.
+
+    Request handlers run their blocking work on the event loop thread, so
+    sampling that thread attributes time to ChatBot, OpenBOMClient and the
+    route code. Concurrent requests on the same loop share samples.
+    """
+
+    def __init__(self, thread_id: int, interval: Optional[float] = None):
+        self.thread_id = thread_id
+        self.interval = max(interval or PROFILING_CONFIG['sample_interval_ms'] / 1000.0, MIN_SAMPLE_INTERVAL)
+        self.stacks: Counter = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.stacks[self._collapse(frame)] += 1
+            self.sample_count += 1
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        """Render a frame chain root-first as 'module:function;...'"""
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            module = frame.f_globals.get('__name__', code.co_filename)
+            names.append(f"{module}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def collapsed(self) -> str:
+        """Collapsed-stack output, one 'stack count' line per unique stack"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+@contextmanager
+def span(name: str):
+    """Time a block of work within the current traced request"""
+    spans = _current_spans.get()
+    if spans is None:
+        yield
+        return
+
+    depth = _current_depth.get()
+    token = _current_depth.set(depth + 1)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _current_depth.reset(token)
+        spans.append({
+            'name': name,
+            'depth': depth,
+            'start_ms': round((start - _trace_start.get()) * 1000, 3),
+            'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+        })
+
+
+def traced(name: str):
+    """Decorator recording a span around each call of the wrapped function"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def track_request(profile: Optional['RequestProfile'] = None):
+    """Count a request as in flight, crediting it as overlap to active profiles"""
+    global _inflight_requests
+    with _active_lock:
+        for active in _active_profiles:
+            active.overlapping_requests += 1
+        if profile is not None:
+            profile.overlapping_requests = _inflight_requests
+            _active_profiles.add(profile)
+        _inflight_requests += 1
+    try:
+        yield
+    finally:
+        with _active_lock:
+            _inflight_requests -= 1
+            _active_profiles.discard(profile)
+
+
+class RequestProfile:
+    """Span and stack-sample capture for a single request"""
+
+    def __init__(self, method: str, path: str, sample: bool):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.spans: List[Dict[str, Any]] = []
+        self.profiler = SamplingProfiler(threading.get_ident()) if sample else None
+        self.started_at = time.time()
+        self.duration_ms = 0.0
+        self.reason: Optional[str] = None
+        # Other requests in flight at any point during this one; their stacks
+        # may appear in this profile's samples
+        self.overlapping_requests = 0
+        self._start = 0.0
+        self._tokens = []
+
+    def __enter__(self) -> 'RequestProfile':
+        self._start = time.perf_counter()
+        self._tokens = [_current_spans.set(self.spans), _trace_start.set(self._start)]
+        if self.profiler:
+            self.profiler.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.profiler:
+            self.profiler.stop()
+        self.duration_ms = round((time.perf_counter() - self._start) * 1000, 3)
+        _trace_start.reset(self._tokens[1])
+        _current_spans.reset(self._tokens[0])
+        return False
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'method': self.method,
+            'path': self.path,
+            'started_at': self.started_at,
+            'duration_ms': self.duration_ms,
+            'sample_count': self.profiler.sample_count if self.profiler else 0,
+            'reason': self.reason,
+            'overlapping_requests': self.overlapping_requests,
+            'stacks_may_include_other_requests': self.overlapping_requests > 0,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**self.summary(), 'spans': sorted(self.spans, key=lambda s: s['start_ms'])}
+
+    def collapsed(self) -> str:
+        return self.profiler.collapsed() if self.profiler else ""
+
+
+class ProfileStore:
+    """Bounded in-memory store of captured request profiles"""
+
+    def __init__(self, max_profiles: Optional[int] = None):
+        self._profiles: deque = deque(maxlen=max_profiles or PROFILING_CONFIG['max_profiles'])
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile, reason: str):
+        profile.reason = reason
+        with self._lock:
+            self._profiles.append(profile)
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [p.summary() for p in reversed(self._profiles)]
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            return next((p for p in self._profiles if p.id == profile_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+
+profile_store = ProfileStore()
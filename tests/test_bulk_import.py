@@ -0,0 +1,153 @@
+"""
+Tests for the bulk part import pipeline, using a fake OpenBOM client.
+"""
+
+import random
+import threading
+import time
+
+from src.bulk_import import BulkImportJob
+
+
+class FakeClient:
+    """In-memory stand-in for OpenBOMClient with small random delays"""
+
+    def __init__(self, parts=None, on_write=None):
+        self.parts = {number: dict(data) for number, data in (parts or {}).items()}
+        self.creates = []
+        self.updates = []
+        self.on_write = on_write
+        self._lock = threading.Lock()
+
+    def _delay(self):
+        time.sleep(random.uniform(0, 0.002))
+
+    def get_part_details(self, part_number, include_bom=True):
+        self._delay()
+        with self._lock:
+            if part_number not in self.parts:
+                return {"error": "404 Client Error: Not Found", "status_code": 404}
+            return dict(self.parts[part_number])
+
+    def create_part(self, part_data, idempotency_key=None):
+        self._delay()
+        with self._lock:
+            self.parts[part_data['part_number']] = dict(part_data)
+            self.creates.append(part_data['part_number'])
+        if self.on_write:
+            self.on_write()
+        return part_data
+
+    def update_part(self, part_number, part_data, idempotency_key=None):
+        self._delay()
+        with self._lock:
+            self.parts[part_number].update(part_data)
+            self.updates.append(part_number)
+        if self.on_write:
+            self.on_write()
+        return self.parts[part_number]
+
+
+def write_csv(path, rows):
+    path.write_text("part_number,name\n" + "".join(f"{number},{name}\n" for number, name in rows))
+    return str(path)
+
+
+def make_job(client, source, tmp_path, **kwargs):
+    return BulkImportJob(client, source, checkpoint_dir=str(tmp_path / "checkpoints"), max_workers=4, **kwargs)
+
+
+def test_unchanged_rows_are_skipped(tmp_path):
+    client = FakeClient(parts={"A": {"part_number": "A", "name": "bolt"}})
+    source = write_csv(tmp_path / "parts.csv", [("A", "bolt"), ("B", "nut")])
+
+    job = make_job(client, source, tmp_path)
+    job.run()
+
+    assert job.state == 'completed'
+    assert job.counts == {'created': 1, 'updated': 0, 'skipped': 1, 'failed': 0}
+    assert client.creates == ["B"]
+    assert client.updates == []
+
+
+def test_duplicate_part_numbers_apply_in_file_order(tmp_path):
+    for _ in range(10):
+        client = FakeClient()
+        source = write_csv(tmp_path / "parts.csv", [("A", f"v{i}") for i in range(1, 9)])
+
+        job = make_job(client, source, tmp_path)
+        job.run()
+
+        assert client.parts["A"]["name"] == "v8"
+        assert client.creates == ["A"]
+        assert job.counts == {'created': 1, 'updated': 7, 'skipped': 0, 'failed': 0}
+
+
+def test_duplicate_row_matching_existing_part_is_skipped(tmp_path):
+    client = FakeClient(parts={"A": {"part_number": "A", "name": "x"}})
+    source = write_csv(tmp_path / "parts.csv", [("A", "x"), ("A", "y")])
+
+    job = make_job(client, source, tmp_path)
+    job.run()
+
+    assert job.counts == {'created': 0, 'updated': 1, 'skipped': 1, 'failed': 0}
+    assert client.parts["A"]["name"] == "y"
+
+
+def test_resume_from_checkpoint_after_interrupted_run(tmp_path):
+    source = write_csv(tmp_path / "parts.csv", [(f"P{i}", "part") for i in range(200)])
+    holder = {}
+
+    def interrupt_after_some_writes():
+        if len(client.creates) == 50:
+            holder['job'].cancel()
+
+    client = FakeClient(on_write=interrupt_after_some_writes)
+    job = holder['job'] = make_job(client, source, tmp_path)
+    job.run()
+
+    assert job.state == 'cancelled'
+    assert 0 < job.committed_offset < 200
+
+    # A fresh process picks the job up from its checkpoint file
+    client.on_write = None
+    resumed = BulkImportJob.load(client, job.job_id, checkpoint_dir=str(tmp_path / "checkpoints"))
+    assert resumed.committed_offset == job.committed_offset
+    resumed.run()
+
+    assert resumed.state == 'completed'
+    assert resumed.committed_offset == 200
+    assert resumed.counts['created'] == 200
+    assert sorted(client.creates) == sorted(f"P{i}" for i in range(200))
+    assert resumed.status()['percent_complete'] == 100.0
+
+
+def test_cancel_and_resume_in_process(tmp_path):
+    source = write_csv(tmp_path / "parts.csv", [(f"P{i}", "part") for i in range(200)])
+    client = FakeClient()
+    job = make_job(client, source, tmp_path)
+
+    # Cancelling an idle job must not stop the next run
+    job.cancel()
+    client.on_write = lambda: len(client.creates) == 20 and job.cancel()
+    job.start().join()
+    assert job.state == 'cancelled'
+    assert 0 < job.committed_offset < 200
+
+    client.on_write = None
+    job.start().join()
+
+    assert job.state == 'completed'
+    assert job.counts['created'] == 200
+    assert len(client.creates) == len(set(client.creates)) == 200
+    assert job.status()['percent_complete'] == 100.0
+
+
+def test_uploaded_source_is_deleted_on_completion(tmp_path):
+    source = write_csv(tmp_path / "parts.csv", [("A", "bolt")])
+
+    job = make_job(FakeClient(), source, tmp_path, delete_source_on_complete=True)
+    job.run()
+
+    assert job.state == 'completed'
+    assert not (tmp_path / "parts.csv").exists()
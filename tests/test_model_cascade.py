@@ -0,0 +1,67 @@
+"""
+Tests for the tiered model cascade, using local fake models.
+"""
+
+import importlib
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+
+from src.config import config
+from src.config.config import MODEL_CASCADE_CONFIG
+from src.model_cascade import ModelCascade, ModelTier
+
+
+def make_cascade(fast_answer: str, large_answer: str = "Detailed answer from the large model") -> ModelCascade:
+    fast = ModelTier('fast', FakeListChatModel(responses=[fast_answer]))
+    large = ModelTier('large', FakeListChatModel(responses=[large_answer]))
+    return ModelCascade(fast, large, rules={**MODEL_CASCADE_CONFIG, 'enabled': True})
+
+
+def ask(cascade: ModelCascade, message: str) -> str:
+    return cascade.invoke([HumanMessage(content=message)], message, context="").content
+
+
+def test_simple_turn_answered_by_fast_tier():
+    cascade = make_cascade("You have two catalogs: Fasteners and Motors.")
+
+    assert ask(cascade, "list my catalogs") == "You have two catalogs: Fasteners and Motors."
+
+    stats = cascade.stats()
+    assert stats['answered_by'] == {'fast': 1, 'large': 0}
+    assert stats['escalations'] == 0
+    assert stats['tiers']['fast']['calls'] == 1
+    assert stats['tiers']['large']['calls'] == 0
+
+
+def test_low_confidence_answer_escalates_to_large_tier():
+    cascade = make_cascade("I'm not sure which part you mean.")
+
+    assert ask(cascade, "what is part 1042") == "Detailed answer from the large model"
+
+    stats = cascade.stats()
+    assert stats['answered_by'] == {'fast': 0, 'large': 1}
+    assert stats['escalations'] == 1
+    assert stats['tiers']['fast']['calls'] == 1
+    assert stats['tiers']['large']['calls'] == 1
+
+
+def test_complex_keyword_goes_straight_to_large_tier():
+    cascade = make_cascade("You have two catalogs: Fasteners and Motors.")
+
+    assert ask(cascade, "explain why part 1042 was revised") == "Detailed answer from the large model"
+
+    stats = cascade.stats()
+    assert stats['answered_by'] == {'fast': 0, 'large': 1}
+    assert stats['escalations'] == 0
+    assert stats['tiers']['fast']['calls'] == 0
+    assert stats['tiers']['large']['calls'] == 1
+
+
+def test_configured_keywords_are_trimmed(monkeypatch):
+    monkeypatch.setenv('MODEL_CASCADE_COMPLEX_KEYWORDS', 'why, Explain ,')
+    try:
+        assert importlib.reload(config).MODEL_CASCADE_CONFIG['complex_keywords'] == ['why', 'explain']
+    finally:
+        monkeypatch.delenv('MODEL_CASCADE_COMPLEX_KEYWORDS')
+        importlib.reload(config)